@@ -52,6 +52,8 @@ def build_server():
         '--hidden-import', 'torch',
         '--hidden-import', 'transformers',
         '--hidden-import', 'fastapi',
+        '--hidden-import', 'sse_starlette',
+        '--hidden-import', 'orjson',
         '--hidden-import', 'uvicorn',
         '--hidden-import', 'sqlalchemy',
         '--hidden-import', 'librosa',
@@ -8,9 +8,10 @@ from fastapi import FastAPI, Depends, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from sse_starlette.sse import EventSourceResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 import asyncio
 import uvicorn
 import argparse
@@ -1133,23 +1134,13 @@ async def unload_model():
 @app.get("/models/progress/{model_name}")
 async def get_model_progress(model_name: str):
     """Get model download progress via Server-Sent Events."""
-    from fastapi.responses import StreamingResponse
-    
     progress_manager = get_progress_manager()
     
-    async def event_generator():
-        """Generate SSE events for progress updates."""
-        async for event in progress_manager.subscribe(model_name):
-            yield event
-    
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+    # EventSourceResponse sets the no-cache/no-buffering headers and sends
+    # the keep-alive pings
+    return EventSourceResponse(
+        progress_manager.subscribe(model_name),
+        ping=progress_manager.SSE_PING_INTERVAL_SECONDS,
     )
 
 
@@ -1587,7 +1578,7 @@ async def get_active_tasks():
     
     # Combine data from both sources
     download_map = {task.model_name: task for task in task_manager_downloads}
-    progress_map = {p["model_name"]: p for p in progress_active}
+    progress_map = {p.model_name: p for p in progress_active}
     
     # Create unified list
     all_model_names = set(download_map.keys()) | set(progress_map.keys())
@@ -1603,19 +1594,10 @@ async def get_active_tasks():
             ))
         elif progress:
             # Progress exists but no task - create from progress data
-            timestamp_str = progress.get("timestamp")
-            if timestamp_str:
-                try:
-                    started_at = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                except (ValueError, AttributeError):
-                    started_at = datetime.utcnow()
-            else:
-                started_at = datetime.utcnow()
-            
             active_downloads.append(models.ActiveDownloadTask(
                 model_name=model_name,
-                status=progress.get("status", "downloading"),
-                started_at=started_at,
+                status=progress.status,
+                started_at=datetime.fromtimestamp(progress.timestamp, tz=timezone.utc),
             ))
     
     # Get active generations
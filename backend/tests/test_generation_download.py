@@ -52,8 +52,8 @@ async def monitor_sse_stream(model_name: str, timeout: int = 120):
                             print(f"[{timestamp}] Error parsing JSON: {e}")
                             print(f"  Line was: {line}")
 
-                    elif line.startswith(": heartbeat"):
-                        print(f"[{timestamp}] ♥ heartbeat")
+                    elif line.startswith(": ping"):
+                        print(f"[{timestamp}] ♥ ping")
 
     except asyncio.TimeoutError:
         print(f"[{_timestamp()}] SSE monitoring timed out")
@@ -5,6 +5,7 @@ Test script to debug model download progress tracking.
 import asyncio
 import json
 import time
+from datetime import datetime, timezone
 from typing import List, Dict
 import logging
 
@@ -14,7 +15,7 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-from utils.progress import ProgressManager, get_progress_manager
+from utils.progress import ProgressManager, get_progress_manager, _LatestSlot, _iso_timestamp
 from utils.hf_progress import HFProgressTracker, create_hf_progress_callback
 
 
@@ -39,16 +40,16 @@ def test_progress_manager_basic():
     progress = pm.get_progress("test-model")
     print(f"✓ Progress stored: {progress}")
     assert progress is not None
-    assert progress["progress"] == 50.0
-    assert progress["filename"] == "test.bin"
-    assert progress["status"] == "downloading"
+    assert progress.progress == 50.0
+    assert progress.filename == "test.bin"
+    assert progress.status == "downloading"
 
     # Test mark_complete
     pm.mark_complete("test-model")
     progress = pm.get_progress("test-model")
     print(f"✓ Marked complete: {progress}")
-    assert progress["status"] == "complete"
-    assert progress["progress"] == 100.0
+    assert progress.status == "complete"
+    assert progress.progress == 100.0
 
     print("✓ Test 1 PASSED\n")
     return True
@@ -69,16 +70,13 @@ async def test_progress_manager_sse():
         print("  SSE client: Subscribing to test-model-sse...")
         async for event in pm.subscribe("test-model-sse"):
             # Parse SSE event
-            if event.startswith("data: "):
-                data = json.loads(event[6:])
-                print(f"  SSE client: Received event: {data['status']} - {data.get('progress', 0):.1f}%")
-                collected_events.append(data)
+            data = json.loads(event[len(b"data: "):])
+            print(f"  SSE client: Received event: {data['status']} - {data.get('progress', 0):.1f}%")
+            collected_events.append(data)
 
-                # Stop when complete
-                if data.get("status") in ("complete", "error"):
-                    break
-            elif event.startswith(": heartbeat"):
-                print("  SSE client: Received heartbeat")
+            # Stop when complete
+            if data.get("status") in ("complete", "error"):
+                break
 
     # Simulate download progress updates (from backend thread)
     async def simulate_download():
@@ -176,12 +174,11 @@ async def test_full_integration():
     async def sse_client():
         print("  SSE client: Subscribing...")
         async for event in pm.subscribe("integration-test"):
-            if event.startswith("data: "):
-                data = json.loads(event[6:])
-                print(f"  SSE client: {data['status']} - {data.get('progress', 0):.1f}% - {data.get('filename', '')}")
-                collected_events.append(data)
-                if data.get("status") in ("complete", "error"):
-                    break
+            data = json.loads(event[len(b"data: "):])
+            print(f"  SSE client: {data['status']} - {data.get('progress', 0):.1f}% - {data.get('filename', '')}")
+            collected_events.append(data)
+            if data.get("status") in ("complete", "error"):
+                break
 
     # Simulate backend download with HFProgressTracker
     async def simulate_real_download():
@@ -249,6 +246,139 @@ async def test_full_integration():
         return False
 
 
+async def test_latest_slot():
+    """Test 5: Listener slot keeps only the latest frame; terminal frames stick."""
+    print("\n" + "=" * 60)
+    print("Test 5: Latest-Value Slot")
+    print("=" * 60)
+
+    # A newer frame replaces one that hasn't been read yet
+    slot = _LatestSlot()
+    slot.set(b"first")
+    slot.set(b"second")
+    frame = await asyncio.wait_for(slot.__anext__(), timeout=1.0)
+    print(f"  Read after two sets: {frame!r}")
+    assert frame == b"second", "Unread frame should be replaced by the newer one"
+
+    # A terminal frame is never replaced, and iteration ends after it
+    slot = _LatestSlot()
+    slot.set(b"complete", terminal=True)
+    slot.set(b"late update")
+    frames = [frame async for frame in slot]
+    print(f"  Frames after terminal set: {frames!r}")
+    assert frames == [b"complete"], "Terminal frame should stick and end the iteration"
+
+    print("✓ Test 5 PASSED\n")
+    return True
+
+
+def test_iso_timestamp():
+    """Test 6: Cached ISO formatter matches datetime.isoformat()."""
+    print("\n" + "=" * 60)
+    print("Test 6: ISO Timestamp Formatting")
+    print("=" * 60)
+
+    base = 1_792_032_630  # Whole second
+    samples = [
+        base + 0.999999,  # Just before a second boundary
+        base + 1.0,       # Zero microseconds
+        base + 1.0000004, # Rounds down to zero microseconds
+        base + 1.9999996, # Rounds up into the next second
+        base + 2.5,
+        time.time(),
+    ]
+    for t in samples:
+        expected = datetime.fromtimestamp(t, tz=timezone.utc).isoformat(timespec="microseconds")
+        actual = _iso_timestamp(t)
+        print(f"  {t!r}: {actual}")
+        assert actual == expected, f"{actual} != {expected}"
+
+    print("✓ Test 6 PASSED\n")
+    return True
+
+
+async def test_slow_client_disconnect():
+    """Test 7: Slow SSE clients get disconnected, but still see complete."""
+    print("\n" + "=" * 60)
+    print("Test 7: Slow Client Disconnect")
+    print("=" * 60)
+
+    async def subscribe_and_read_first(pm, model_name):
+        """Subscribe and read the first update, then stop reading."""
+        stream = pm.subscribe(model_name)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)  # Let the subscription register
+        pm.update_progress(model_name=model_name, current=0, total=100, filename="model.bin")
+        await first
+        return stream
+
+    # A client that never reads gets its stream ended
+    pm = ProgressManager()
+    pm.THROTTLE_INTERVAL_SECONDS = 0  # Publish every update
+    stream = await subscribe_and_read_first(pm, "slow-model")
+    for i in range(1, pm.MAX_DROPPED_UPDATES + 10):
+        pm.update_progress(model_name="slow-model", current=i, total=100, filename="model.bin")
+    try:
+        frame = await asyncio.wait_for(stream.__anext__(), timeout=1.0)
+        raise AssertionError(f"Stream should have ended, got {frame!r}")
+    except StopAsyncIteration:
+        print("  Slow client stream ended")
+    assert pm.slow_clients_disconnected_total == 1, "Disconnect should be counted"
+
+    # A client that is behind still receives a pending complete frame
+    pm = ProgressManager()
+    pm.THROTTLE_INTERVAL_SECONDS = 0
+    stream = await subscribe_and_read_first(pm, "behind-model")
+    for i in range(1, pm.MAX_DROPPED_UPDATES + 1):
+        pm.update_progress(model_name="behind-model", current=i, total=100, filename="model.bin")
+    pm.mark_complete("behind-model")
+    frames = [frame async for frame in stream]
+    data = json.loads(frames[-1][len(b"data: "):])
+    print(f"  Behind client received: {data['status']} - {data['progress']:.1f}%")
+    assert len(frames) == 1 and data["status"] == "complete", "Should receive only the complete frame"
+    assert pm.slow_clients_disconnected_total == 0, "Client with pending complete should not be disconnected"
+
+    print("✓ Test 7 PASSED\n")
+    return True
+
+
+async def test_thread_updates():
+    """Test 8: Updates from a worker thread end on complete."""
+    print("\n" + "=" * 60)
+    print("Test 8: Background Thread Updates")
+    print("=" * 60)
+
+    pm = ProgressManager()
+    pm.THROTTLE_INTERVAL_SECONDS = 0  # Publish every update
+    stream = pm.subscribe("thread-model")
+    first = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)  # Let the subscription register
+    pm.update_progress(model_name="thread-model", current=0, total=1000, filename="model.bin")
+    events = [await first]
+
+    async def read_stream():
+        async for frame in stream:
+            events.append(frame)
+
+    reader = asyncio.create_task(read_stream())
+
+    def worker():
+        for i in range(1, 1000):
+            pm.update_progress(model_name="thread-model", current=i, total=1000, filename="model.bin")
+        pm.mark_complete("thread-model")
+
+    await asyncio.to_thread(worker)
+    await asyncio.wait_for(reader, timeout=5.0)
+
+    data = json.loads(events[-1][len(b"data: "):])
+    print(f"  Received {len(events)} events, last: {data['status']} - {data['progress']:.1f}%")
+    assert data["status"] == "complete", "Stream should end on complete"
+    assert data["progress"] == 100.0, "Complete should report 100%"
+
+    print("✓ Test 8 PASSED\n")
+    return True
+
+
 async def main():
     """Run all tests."""
     print("\n" + "=" * 60)
@@ -285,6 +415,34 @@ async def main():
         print(f"✗ Test 4 FAILED: {e}\n")
         results.append(("Full Integration", False))
 
+    # Test 5: Latest-value slot
+    try:
+        results.append(("Latest-Value Slot", await test_latest_slot()))
+    except Exception as e:
+        print(f"✗ Test 5 FAILED: {e}\n")
+        results.append(("Latest-Value Slot", False))
+
+    # Test 6: ISO timestamp formatting
+    try:
+        results.append(("ISO Timestamps", test_iso_timestamp()))
+    except Exception as e:
+        print(f"✗ Test 6 FAILED: {e}\n")
+        results.append(("ISO Timestamps", False))
+
+    # Test 7: Slow client disconnect
+    try:
+        results.append(("Slow Client Disconnect", await test_slow_client_disconnect()))
+    except Exception as e:
+        print(f"✗ Test 7 FAILED: {e}\n")
+        results.append(("Slow Client Disconnect", False))
+
+    # Test 8: Background thread updates
+    try:
+        results.append(("Background Thread Updates", await test_thread_updates()))
+    except Exception as e:
+        print(f"✗ Test 8 FAILED: {e}\n")
+        results.append(("Background Thread Updates", False))
+
     # Summary
     print("\n" + "=" * 60)
     print("Test Results Summary")
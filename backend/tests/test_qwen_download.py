@@ -80,8 +80,8 @@ async def monitor_sse_stream(model_name: str, timeout: int = 600) -> List[Dict]:
                         except json.JSONDecodeError as e:
                             print(f"   ⚠️  Error parsing JSON: {e}")
 
-                    elif line.startswith(": heartbeat"):
-                        # Heartbeat every 1 second, don't spam
+                    elif line.startswith(": ping"):
+                        # Keep-alive ping every 15 seconds, don't spam
                         pass
 
     except asyncio.CancelledError:
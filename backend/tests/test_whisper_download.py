@@ -44,8 +44,8 @@ async def monitor_sse_stream(model_name: str, timeout: int = 300):
                         print(f"  Error parsing JSON: {e}")
                         print(f"  Line was: {line}")
 
-                elif line.startswith(": heartbeat"):
-                    print("  ♥ heartbeat")
+                elif line.startswith(": ping"):
+                    print("  ♥ ping")
 
     return events
 
@@ -2,62 +2,274 @@
 Progress tracking for model downloads using Server-Sent Events.
 """
 
-from typing import Optional, Callable, Dict, List
-from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Optional, Callable, Dict, List, Set
+from dataclasses import dataclass, replace
 import asyncio
-import json
+import logging
 import threading
-from datetime import datetime
+import time
+import orjson
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Statuses of a download that is still in progress
+_ACTIVE_STATUSES = frozenset(("downloading", "extracting"))
+
+# (whole second, "YYYY-MM-DDTHH:MM:SS") of the last formatted timestamp
+_iso_prefix_cache = (0, "")
+
+
+def _iso_timestamp(timestamp: float) -> str:
+    """Format a time.time() value as an ISO 8601 UTC string.
+
+    Same output as ``datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    .isoformat(timespec="microseconds")``. Many updates land within the same
+    second, so the date/time part is cached per second and only the
+    microseconds are formatted on each call.
+    """
+    global _iso_prefix_cache
+    seconds = int(timestamp)
+    # Round to the nearest microsecond (half-even, like datetime does)
+    microseconds = round((timestamp - seconds) * 1_000_000)
+    if microseconds == 1_000_000:
+        seconds += 1
+        microseconds = 0
+    cached_seconds, prefix = _iso_prefix_cache
+    if seconds != cached_seconds:
+        prefix = datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        _iso_prefix_cache = (seconds, prefix)
+    return f"{prefix}.{microseconds:06d}+00:00"
+
+
+@dataclass(frozen=True, slots=True)
+class ProgressSnapshot:
+    """Immutable progress state of a model download."""
+    model_name: str
+    current: int
+    total: int
+    filename: Optional[str]
+    status: str  # downloading, extracting, complete, error
+    timestamp: float  # time.time() of the update
+    error: Optional[str] = None
+
+    @property
+    def progress(self) -> float:
+        """Percentage downloaded, derived from current/total."""
+        if self.status == "complete":
+            return 100.0
+        if self.total <= 0:
+            return 0.0
+        # Clamp to 0-100 range. This prevents crazy percentages from edge cases like:
+        # - current > total temporarily during aggregation
+        # - mixing file-count progress with byte-count progress
+        return min(100.0, max(0.0, self.current * 100.0 / self.total))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dict, formatting the timestamp as ISO 8601."""
+        data: Dict[str, Any] = {
+            "model_name": self.model_name,
+            "current": self.current,
+            "total": self.total,
+            "progress": self.progress,
+            "filename": self.filename,
+            "status": self.status,
+            "timestamp": _iso_timestamp(self.timestamp),
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+def _format_event(progress_data: ProgressSnapshot) -> bytes:
+    """Serialize a progress snapshot into a complete SSE data frame.
+
+    EventSourceResponse sends bytes as-is, so the frame is encoded once per
+    update and shared by every listener.
+    """
+    return b"data: " + orjson.dumps(progress_data.to_dict()) + b"\n\n"
+
+
+class _LatestSlot:
+    """Single-slot receive channel holding only the most recent frame for a listener.
+
+    SSE clients only care about the latest progress, so a new frame simply
+    overwrites one that hasn't been consumed yet. Terminal frames
+    (complete/error) are sticky and never get overwritten.
+
+    Iterate it with ``async for``, like an anyio memory object receive stream:
+    iteration ends after the terminal frame has been received, or right away
+    once the channel is closed.
+
+    ``drops`` counts frames overwritten in a row without the listener reading
+    any of them, which is how slow clients are detected.
+
+    Not thread-safe: only call set() and close() from the event loop thread.
+    """
+
+    __slots__ = ("value", "terminal", "drops", "_done", "_event")
+
+    def __init__(self) -> None:
+        self.value: Optional[bytes] = None
+        self.terminal = False
+        self.drops = 0
+        self._done = False
+        self._event = asyncio.Event()
+
+    def set(self, value: bytes, terminal: bool = False) -> None:
+        if self.terminal:
+            return
+        if self._event.is_set():
+            # Previous value was never read
+            self.drops += 1
+        self.value = value
+        self.terminal = terminal
+        self._event.set()
+
+    def close(self) -> None:
+        """End the listener's iteration, discarding any unread frame."""
+        self.value = None
+        self.terminal = True
+        self._event.set()
+
+    def __aiter__(self) -> "_LatestSlot":
+        return self
+
+    async def __anext__(self) -> bytes:
+        if self._done:
+            raise StopAsyncIteration
+        await self._event.wait()
+        self._event.clear()
+        self.drops = 0
+        value = self.value
+        if value is None:
+            raise StopAsyncIteration
+        self._done = self.terminal
+        return value
 
 
 class ProgressManager:
     """Manages download progress for multiple models.
     
     Thread-safe: can be called from background threads (e.g., via asyncio.to_thread).
+    Listeners are only ever modified and notified on the main event loop.
+
+    Progress entries are read-only snapshots. Every update builds a new
+    snapshot instead of mutating the previous one, so the same object can be
+    handed to every listener without copying.
     """
     
     # Throttle settings to prevent overwhelming SSE clients
     THROTTLE_INTERVAL_SECONDS = 0.5  # Minimum time between updates
     THROTTLE_PROGRESS_DELTA = 1.0    # Minimum progress change (%) to force update
+
+    # Disconnect SSE clients that miss this many updates in a row. They
+    # reconnect and re-sync from the current progress.
+    MAX_DROPPED_UPDATES = 50
+
+    # Keep-alive ping interval for idle SSE connections. Listeners never wake
+    # up on their own; the ping is sent by EventSourceResponse.
+    SSE_PING_INTERVAL_SECONDS = 15
     
-    def __init__(self):
-        self._progress: Dict[str, Dict] = {}
-        self._listeners: Dict[str, list] = {}
+    def __init__(self) -> None:
+        self._progress: Dict[str, ProgressSnapshot] = {}
+        self._listeners: Dict[str, Set["_LatestSlot"]] = {}
         self._lock = threading.Lock()  # Thread-safe lock for progress dict
         self._main_loop: Optional[asyncio.AbstractEventLoop] = None
         self._last_notify_time: Dict[str, float] = {}  # Last notification time per model
         self._last_notify_progress: Dict[str, float] = {}  # Last notified progress per model
+        self._last_notify_status: Dict[str, str] = {}  # Last notified status per model
+        self.slow_clients_disconnected_total = 0  # Listeners closed for falling behind
+        # Latest snapshot per model waiting to be published from a background thread
+        self._pending: Dict[str, ProgressSnapshot] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
     
-    def _set_main_loop(self, loop: asyncio.AbstractEventLoop):
+    def _set_main_loop(self, loop: asyncio.AbstractEventLoop) -> None:
         """Set the main event loop for thread-safe operations."""
         self._main_loop = loop
     
-    def _notify_listeners_threadsafe(self, model_name: str, progress_data: Dict):
-        """Notify listeners in a thread-safe manner."""
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        if model_name not in self._listeners:
+    def _notify_listeners_threadsafe(self, model_name: str, progress_data: ProgressSnapshot) -> None:
+        """Notify listeners in a thread-safe manner.
+
+        Listener slots are only touched on the main event loop. From a
+        background thread, the snapshot is stashed in ``_pending`` and a flush
+        is scheduled with call_soon_threadsafe, unless one is already
+        scheduled. Updates arriving before the flush runs just replace the
+        pending snapshot, so a burst of thread-side updates costs one loop
+        wakeup and one serialization.
+        """
+        loop = self._main_loop
+        if loop is None or model_name not in self._listeners:
             return
-            
-        for queue in self._listeners[model_name]:
-            try:
-                # Check if we're in the main event loop thread
+
+        # Check if we're in the main event loop thread
+        try:
+            in_main_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            in_main_loop = False
+
+        if in_main_loop:
+            # Publish anything still pending first to keep updates in order
+            self._flush_pending()
+            self._publish(progress_data)
+        elif loop.is_running():
+            with self._pending_lock:
+                pending = self._pending.get(model_name)
+                # Never let a later update replace a pending complete/error
+                if pending is None or pending.status not in ("complete", "error"):
+                    self._pending[model_name] = progress_data
+                need_flush = not self._flush_scheduled
+                self._flush_scheduled = True
+            if need_flush:
                 try:
-                    running_loop = asyncio.get_running_loop()
-                    # We're in an async context, can use put_nowait directly
-                    queue.put_nowait(progress_data.copy())
-                except RuntimeError:
-                    # Not in async context (running in background thread)
-                    # Use call_soon_threadsafe to safely put on queue
-                    if self._main_loop and self._main_loop.is_running():
-                        self._main_loop.call_soon_threadsafe(
-                            lambda q=queue, d=progress_data.copy(): q.put_nowait(d) if not q.full() else None
-                        )
-                    else:
-                        logger.debug(f"No main loop available for {model_name}, skipping notification")
-            except asyncio.QueueFull:
-                logger.warning(f"Queue full for {model_name}, dropping update")
+                    loop.call_soon_threadsafe(self._flush_pending)
+                except Exception as e:
+                    # Loop closed between the check and the call; let the next update retry
+                    with self._pending_lock:
+                        self._flush_scheduled = False
+                    logger.warning("Could not schedule progress flush for %s: %s", model_name, e)
+        else:
+            logger.debug("No main loop available for %s, skipping notification", model_name)
+
+    def _flush_pending(self) -> None:
+        """Publish snapshots stashed by background threads. Event loop thread only."""
+        with self._pending_lock:
+            pending = self._pending
+            self._pending = {}
+            self._flush_scheduled = False
+        for progress_data in pending.values():
+            self._publish(progress_data)
+
+    def _publish(self, progress_data: ProgressSnapshot) -> None:
+        """Hand a snapshot to every listener of its model. Event loop thread only.
+
+        The snapshot is serialized once here and every listener receives the
+        same frame.
+        """
+        model_name = progress_data.model_name
+        listeners = self._listeners.get(model_name)
+        if not listeners:
+            return
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Sending progress update for %s to %d listeners: %s - %.1f%%",
+                model_name, len(listeners), progress_data.status, progress_data.progress,
+            )
+        frame = _format_event(progress_data)
+        terminal = progress_data.status in ("complete", "error")
+
+        for slot in listeners:
+            try:
+                slot.set(frame, terminal)
+                if slot.drops > self.MAX_DROPPED_UPDATES and not slot.terminal:
+                    slot.close()
+                    self.slow_clients_disconnected_total += 1
+                    logger.warning(
+                        "SSE client for %s missed %d updates, disconnecting (%d slow clients disconnected so far)",
+                        model_name, slot.drops, self.slow_clients_disconnected_total,
+                    )
             except Exception as e:
                 logger.warning(f"Error notifying listener for {model_name}: {e}")
 
@@ -68,7 +280,7 @@ class ProgressManager:
         total: int,
         filename: Optional[str] = None,
         status: str = "downloading",
-    ):
+    ) -> None:
         """
         Update progress for a model download.
 
@@ -76,7 +288,9 @@ class ProgressManager:
         
         Progress updates are throttled to prevent overwhelming SSE clients.
         Updates are sent at most every THROTTLE_INTERVAL_SECONDS, or when
-        progress changes by at least THROTTLE_PROGRESS_DELTA percent.
+        progress changes by at least THROTTLE_PROGRESS_DELTA percent. Status
+        changes are always sent. Throttled updates are still stored for
+        get_progress().
 
         Args:
             model_name: Name of the model (e.g., "qwen-tts-1.7B", "whisper-base")
@@ -85,81 +299,72 @@ class ProgressManager:
             filename: Current file being downloaded
             status: Status string (downloading, extracting, complete, error)
         """
-        import logging
-        import time
-        logger = logging.getLogger(__name__)
-
-        # Calculate progress percentage, clamped to 0-100 range
-        # This prevents crazy percentages from edge cases like:
-        # - current > total temporarily during aggregation
-        # - mixing file-count progress with byte-count progress
-        if total > 0:
-            progress_pct = min(100.0, max(0.0, (current / total * 100)))
-        else:
-            progress_pct = 0
-
-        progress_data = {
-            "model_name": model_name,
-            "current": current,
-            "total": total,
-            "progress": progress_pct,
-            "filename": filename,
-            "status": status,
-            "timestamp": datetime.now().isoformat(),
-        }
-
-        # Thread-safe update of progress dict (always update internal state)
-        with self._lock:
-            self._progress[model_name] = progress_data
+        progress_data = ProgressSnapshot(
+            model_name=model_name,
+            current=current,
+            total=total,
+            filename=filename,
+            status=status,
+            timestamp=time.time(),
+        )
+        progress_pct = progress_data.progress
 
         # Check if we should notify listeners (throttling)
-        current_time = time.time()
-        last_time = self._last_notify_time.get(model_name, 0)
+        current_time = time.monotonic()
+        last_time = self._last_notify_time.get(model_name)
         last_progress = self._last_notify_progress.get(model_name, -100)
         
-        time_delta = current_time - last_time
         progress_delta = abs(progress_pct - last_progress)
         
-        # Always notify for complete/error status, or if throttle conditions are met
+        # Always notify for the first update, status changes and complete/error,
+        # otherwise only if throttle conditions are met
         should_notify = (
+            last_time is None or
             status in ("complete", "error") or
-            time_delta >= self.THROTTLE_INTERVAL_SECONDS or
+            status != self._last_notify_status.get(model_name) or
+            current_time - last_time >= self.THROTTLE_INTERVAL_SECONDS or
             progress_delta >= self.THROTTLE_PROGRESS_DELTA
         )
         
+        if should_notify:
+            # Update throttle tracking
+            self._last_notify_time[model_name] = current_time
+            self._last_notify_progress[model_name] = progress_pct
+            self._last_notify_status[model_name] = status
+
+        # Thread-safe update of progress dict (always update internal state)
+        with self._lock:
+            self._progress[model_name] = progress_data
+
         if not should_notify:
             return  # Skip this update (throttled)
-        
-        # Update throttle tracking
-        self._last_notify_time[model_name] = current_time
-        self._last_notify_progress[model_name] = progress_pct
 
         # Notify all listeners (thread-safe)
-        listener_count = len(self._listeners.get(model_name, []))
+        listener_count = len(self._listeners.get(model_name, ()))
 
         if listener_count > 0:
-            logger.debug(f"Notifying {listener_count} listeners for {model_name}: {progress_pct:.1f}% ({filename})")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Notifying %d listeners for %s: %.1f%% (%s)", listener_count, model_name, progress_pct, filename)
             self._notify_listeners_threadsafe(model_name, progress_data)
-        else:
-            logger.debug(f"No listeners for {model_name}, progress update stored: {progress_pct:.1f}%")
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("No listeners for %s, progress update stored: %.1f%%", model_name, progress_pct)
     
-    def get_progress(self, model_name: str) -> Optional[Dict]:
+    def get_progress(self, model_name: str) -> Optional[ProgressSnapshot]:
         """Get current progress for a model. Thread-safe."""
         with self._lock:
-            progress = self._progress.get(model_name)
-            return progress.copy() if progress else None
+            return self._progress.get(model_name)
     
-    def get_all_active(self) -> List[Dict]:
-        """Get all active downloads (status is 'downloading' or 'extracting'). Thread-safe."""
-        active = []
+    def get_all_active(self) -> List[ProgressSnapshot]:
+        """Get all active downloads (status is 'downloading' or 'extracting'). Thread-safe.
+
+        Snapshots are immutable, so they are returned as-is without copying.
+        """
         with self._lock:
-            for model_name, progress in self._progress.items():
-                status = progress.get("status", "")
-                if status in ("downloading", "extracting"):
-                    active.append(progress.copy())
-        return active
+            return [p for p in self._progress.values() if p.status in _ACTIVE_STATUSES]
     
-    def create_progress_callback(self, model_name: str, filename: Optional[str] = None):
+    def create_progress_callback(
+        self, model_name: str, filename: Optional[str] = None
+    ) -> Callable[[Dict[str, Any]], None]:
         """
         Create a progress callback function for HuggingFace downloads.
         
@@ -170,7 +375,7 @@ class ProgressManager:
         Returns:
             Callback function
         """
-        def callback(progress: Dict):
+        def callback(progress: Dict[str, Any]) -> None:
             """HuggingFace Hub progress callback."""
             if "total" in progress and "current" in progress:
                 current = progress.get("current", 0)
@@ -187,127 +392,99 @@ class ProgressManager:
         
         return callback
     
-    async def subscribe(self, model_name: str):
+    async def subscribe(self, model_name: str) -> AsyncIterator[bytes]:
         """
         Subscribe to progress updates for a model.
 
-        Yields progress updates as Server-Sent Events.
+        Yields progress updates as encoded SSE frames (bytes), to be streamed
+        with an EventSourceResponse using ``ping=SSE_PING_INTERVAL_SECONDS``.
+        Between updates the generator just waits on its slot, without any
+        timeout or polling.
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        
         # Store the main event loop for thread-safe operations
         try:
             self._main_loop = asyncio.get_running_loop()
         except RuntimeError:
             pass
 
-        queue = asyncio.Queue(maxsize=10)
+        slot = _LatestSlot()
 
         # Add to listeners
-        if model_name not in self._listeners:
-            self._listeners[model_name] = []
-        self._listeners[model_name].append(queue)
+        self._listeners.setdefault(model_name, set()).add(slot)
 
-        logger.info(f"SSE client subscribed to {model_name}, total listeners: {len(self._listeners[model_name])}")
+        logger.info("SSE client subscribed to %s, total listeners: %d", model_name, len(self._listeners[model_name]))
 
         try:
             # Send initial progress if available and still in progress (thread-safe read)
             with self._lock:
                 initial_progress = self._progress.get(model_name)
-                if initial_progress:
-                    initial_progress = initial_progress.copy()
             
             if initial_progress:
-                status = initial_progress.get('status')
+                status = initial_progress.status
                 # Only send initial progress if download is actually in progress
                 # Don't send old 'complete' or 'error' status from previous downloads
-                if status in ('downloading', 'extracting'):
-                    logger.info(f"Sending initial progress for {model_name}: {status}")
-                    yield f"data: {json.dumps(initial_progress)}\n\n"
+                if status in _ACTIVE_STATUSES:
+                    logger.info("Sending initial progress for %s: %s", model_name, status)
+                    yield _format_event(initial_progress)
                 else:
-                    logger.info(f"Skipping initial progress for {model_name} (status: {status})")
+                    logger.info("Skipping initial progress for %s (status: %s)", model_name, status)
             else:
-                logger.info(f"No initial progress available for {model_name}")
+                logger.info("No initial progress available for %s", model_name)
 
-            # Stream updates
-            while True:
-                try:
-                    # Wait for update with timeout
-                    progress = await asyncio.wait_for(queue.get(), timeout=1.0)
-                    logger.debug(f"Sending progress update for {model_name}: {progress.get('status')} - {progress.get('progress', 0):.1f}%")
-                    yield f"data: {json.dumps(progress)}\n\n"
-
-                    # Stop if complete or error
-                    if progress.get("status") in ("complete", "error"):
-                        logger.info(f"Download {progress.get('status')} for {model_name}, closing SSE connection")
-                        break
-                except asyncio.TimeoutError:
-                    # Send heartbeat
-                    yield ": heartbeat\n\n"
-                    continue
+            # Stream updates until complete/error, or until the slot is
+            # closed for falling behind
+            async for frame in slot:
+                yield frame
+            logger.info("Progress stream for %s finished, closing SSE connection", model_name)
         finally:
             # Remove from listeners
             if model_name in self._listeners:
-                self._listeners[model_name].remove(queue)
+                self._listeners[model_name].discard(slot)
                 if not self._listeners[model_name]:
                     del self._listeners[model_name]
-                logger.info(f"SSE client unsubscribed from {model_name}, remaining listeners: {len(self._listeners.get(model_name, []))}")
+                logger.info("SSE client unsubscribed from %s, remaining listeners: %d", model_name, len(self._listeners.get(model_name, ())))
     
-    def mark_complete(self, model_name: str):
+    def mark_complete(self, model_name: str) -> None:
         """Mark a model download as complete. Thread-safe."""
-        import logging
-        logger = logging.getLogger(__name__)
-
         with self._lock:
             if model_name in self._progress:
-                self._progress[model_name]["status"] = "complete"
-                self._progress[model_name]["progress"] = 100.0
-                progress_data = self._progress[model_name].copy()
+                progress_data = replace(self._progress[model_name], status="complete")
+                self._progress[model_name] = progress_data
             else:
                 logger.warning(f"Cannot mark {model_name} as complete: not found in progress")
                 return
         
-        logger.info(f"Marked {model_name} as complete")
+        logger.info("Marked %s as complete", model_name)
         # Notify listeners (thread-safe)
         self._notify_listeners_threadsafe(model_name, progress_data)
     
-    def mark_error(self, model_name: str, error: str):
+    def mark_error(self, model_name: str, error: str) -> None:
         """Mark a model download as failed. Thread-safe."""
-        import logging
-        logger = logging.getLogger(__name__)
-
         with self._lock:
             if model_name in self._progress:
-                self._progress[model_name]["status"] = "error"
-                self._progress[model_name]["error"] = error
-                progress_data = self._progress[model_name].copy()
+                progress_data = replace(self._progress[model_name], status="error", error=error)
             else:
                 # Create new progress entry for error
-                progress_data = {
-                    "model_name": model_name,
-                    "current": 0,
-                    "total": 0,
-                    "progress": 0,
-                    "filename": None,
-                    "status": "error",
-                    "error": error,
-                    "timestamp": datetime.now().isoformat(),
-                }
-                self._progress[model_name] = progress_data
+                progress_data = ProgressSnapshot(
+                    model_name=model_name,
+                    current=0,
+                    total=0,
+                    filename=None,
+                    status="error",
+                    timestamp=time.time(),
+                    error=error,
+                )
+            self._progress[model_name] = progress_data
         
         logger.error(f"Marked {model_name} as error: {error}")
         # Notify listeners (thread-safe)
         self._notify_listeners_threadsafe(model_name, progress_data)
 
 
-# Global progress manager instance
-_progress_manager: Optional[ProgressManager] = None
+# Global progress manager instance, created at import so lookups are a plain return
+_progress_manager = ProgressManager()
 
 
 def get_progress_manager() -> ProgressManager:
-    """Get or create the global progress manager."""
-    global _progress_manager
-    if _progress_manager is None:
-        _progress_manager = ProgressManager()
+    """Get the global progress manager."""
     return _progress_manager